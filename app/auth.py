@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db
-from app.models import User
+from app.models import User, invalidate_user_cache
 from app.forms import LoginForm, RegistrationForm
 
 auth_bp = Blueprint('auth', __name__)
@@ -46,6 +46,7 @@ def register():
 @auth_bp.route('/logout')
 @login_required
 def logout():
+    invalidate_user_cache(current_user.id)
     logout_user()
     flash('You have been logged out.', 'info')
     return redirect(url_for('auth.login'))
\ No newline at end of file
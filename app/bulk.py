@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+from email_validator import validate_email, EmailNotValidError
+from app.filters import parse_rules
+
+IMPORT_FIELDS = ['name', 'spreadsheet_id', 'worksheet_name', 'sender_email',
+                 'gmail_app_password', 'recipient_email', 'poll_interval',
+                 'filter_rules', 'is_active']
+
+# App passwords are never exported; imports must supply them again.
+EXPORT_FIELDS = ['id', 'name', 'spreadsheet_id', 'worksheet_name', 'sender_email',
+                 'recipient_email', 'poll_interval', 'filter_rules', 'is_active']
+
+REQUIRED_FIELDS = ['name', 'spreadsheet_id', 'sender_email', 'gmail_app_password', 'recipient_email']
+
+# Column lengths from app.models.Configuration. Checked up front so an
+# oversized value is reported per row instead of failing the whole commit.
+MAX_LENGTHS = {
+    'name': 100,
+    'spreadsheet_id': 100,
+    'worksheet_name': 100,
+    'sender_email': 120,
+    'gmail_app_password': 100,
+    'recipient_email': 120,
+}
+
+def parse_import(text, fmt):
+    """Parse CSV or JSON import text into a list of raw row dicts."""
+    if fmt == 'csv':
+        return list(csv.DictReader(io.StringIO(text)))
+
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get('configurations')
+    if not isinstance(data, list):
+        raise ValueError("JSON import must be a list of configurations")
+    return data
+
+MIN_POLL_INTERVAL = 1
+MAX_POLL_INTERVAL = 86400
+
+def _parse_poll_interval(value):
+    """Parse a poll interval in seconds; raises ValueError if out of range."""
+    if value is None or value == '':
+        return 30
+    message = f"poll_interval must be an integer between {MIN_POLL_INTERVAL} and {MAX_POLL_INTERVAL}"
+    if isinstance(value, bool):
+        raise ValueError(message)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(message)
+        value = int(value)
+    elif isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(message)
+    elif not isinstance(value, int):
+        raise ValueError(message)
+    if not MIN_POLL_INTERVAL <= value <= MAX_POLL_INTERVAL:
+        raise ValueError(message)
+    return value
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+def _parse_bool(value, default=True):
+    """Parse a boolean import value; raises ValueError if unrecognised."""
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"is_active must be one of {', '.join(TRUE_VALUES + FALSE_VALUES)}")
+
+def validate_import_row(row):
+    """Validate one raw import row.
+
+    Returns (values, errors) where values holds Configuration keyword
+    arguments and errors is a list of messages for this row.
+    """
+    if not isinstance(row, dict):
+        return None, ["Row must be an object"]
+
+    errors = []
+    values = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        values[field] = value.strip() if isinstance(value, str) else value
+
+    for field, max_length in MAX_LENGTHS.items():
+        value = values[field]
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            errors.append(f"{field} must be a string")
+        elif len(value) > max_length:
+            errors.append(f"{field} must be at most {max_length} characters")
+
+    for field in REQUIRED_FIELDS:
+        if not values[field]:
+            errors.append(f"{field} is required")
+
+    for field in ('sender_email', 'recipient_email'):
+        if values[field] and isinstance(values[field], str):
+            try:
+                validate_email(values[field], check_deliverability=False)
+            except EmailNotValidError:
+                errors.append(f"{field} is not a valid email address")
+
+    values['worksheet_name'] = values['worksheet_name'] or 'Sheet1'
+
+    try:
+        values['poll_interval'] = _parse_poll_interval(values['poll_interval'])
+    except ValueError as e:
+        errors.append(str(e))
+
+    if isinstance(values['filter_rules'], (list, dict)):
+        values['filter_rules'] = json.dumps(values['filter_rules'])
+    if values['filter_rules'] is not None and not isinstance(values['filter_rules'], str):
+        errors.append("filter_rules must be a JSON string or a list of rules")
+    else:
+        try:
+            parse_rules(values['filter_rules'])
+        except ValueError as e:
+            errors.append(str(e))
+    values['filter_rules'] = values['filter_rules'] or None
+
+    try:
+        values['is_active'] = _parse_bool(values['is_active'])
+    except ValueError as e:
+        errors.append(str(e))
+    return values, errors
+
+def export_configurations(configurations, fmt):
+    """Serialize configurations as CSV or JSON text."""
+    rows = [{field: getattr(config, field) for field in EXPORT_FIELDS} for config in configurations]
+    if fmt == 'csv':
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return output.getvalue()
+    return json.dumps({'configurations': rows}, indent=2)
@@ -0,0 +1,191 @@
+import json
+import re
+from email_validator import validate_email, EmailNotValidError
+
+# Supported rule operators. Numeric operators compare cells as floats and
+# never match cells that cannot be parsed as a number.
+TEXT_OPERATORS = ('eq', 'ne', 'contains', 'regex')
+NUMERIC_OPERATORS = ('gt', 'gte', 'lt', 'lte')
+OPERATORS = TEXT_OPERATORS + NUMERIC_OPERATORS
+
+def _conditions(rule):
+    # A rule is either a single condition or {"all": [conditions...]}.
+    return rule['all'] if 'all' in rule else [rule]
+
+def _validate_condition(label, condition):
+    if not isinstance(condition, dict):
+        raise ValueError(f"{label} must be an object")
+    column = condition.get('column')
+    if not isinstance(column, str) or not column.strip():
+        raise ValueError(f"{label} is missing a column name")
+    op = condition.get('op')
+    if op not in OPERATORS:
+        raise ValueError(f"{label} has unknown operator {op!r}; use one of {', '.join(OPERATORS)}")
+    if 'value' not in condition:
+        raise ValueError(f"{label} is missing a value")
+    if op in NUMERIC_OPERATORS:
+        try:
+            float(condition['value'])
+        except (TypeError, ValueError):
+            raise ValueError(f"{label} compares with {op!r} but value is not a number")
+    if op == 'regex':
+        try:
+            re.compile(str(condition['value']))
+        except re.error as e:
+            raise ValueError(f"{label} has an invalid regex: {e}")
+
+def parse_rules(raw):
+    """Parse and validate the JSON rule list stored on a Configuration.
+
+    Each rule is a single condition such as
+    {"column": "Status", "op": "eq", "value": "urgent", "recipient": "ops@example.com"}
+    or a group whose conditions must all match, such as
+    {"all": [{"column": "Status", "op": "eq", "value": "urgent"},
+             {"column": "Amount", "op": "gt", "value": 1000}]}.
+    A row matching any rule is sent. "recipient" is optional; rules without
+    one route to the configuration's default recipient. Raises ValueError
+    describing the first invalid rule.
+    """
+    if not raw or not raw.strip():
+        return []
+
+    try:
+        rules = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"Filter rules must be valid JSON: {e}")
+
+    if not isinstance(rules, list):
+        raise ValueError("Filter rules must be a JSON list of rules")
+
+    for i, rule in enumerate(rules, start=1):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule {i} must be an object")
+        if 'all' in rule:
+            conditions = rule['all']
+            if not isinstance(conditions, list) or not conditions:
+                raise ValueError(f"Rule {i} 'all' must be a non-empty list of conditions")
+            for j, condition in enumerate(conditions, start=1):
+                _validate_condition(f"Rule {i} condition {j}", condition)
+        else:
+            _validate_condition(f"Rule {i}", rule)
+        recipient = rule.get('recipient')
+        if recipient is not None:
+            if not isinstance(recipient, str):
+                raise ValueError(f"Rule {i} has an invalid recipient {recipient!r}")
+            try:
+                validate_email(recipient, check_deliverability=False)
+            except EmailNotValidError:
+                raise ValueError(f"Rule {i} has an invalid recipient {recipient!r}")
+
+    return rules
+
+def _to_number(value):
+    try:
+        return float(str(value).replace(',', '').strip())
+    except ValueError:
+        return None
+
+def _make_predicate(index, op, value):
+    if op == 'eq':
+        expected = str(value).strip().lower()
+        return lambda row: _cell(row, index).strip().lower() == expected
+    if op == 'ne':
+        expected = str(value).strip().lower()
+        return lambda row: _cell(row, index).strip().lower() != expected
+    if op == 'contains':
+        needle = str(value).lower()
+        return lambda row: needle in _cell(row, index).lower()
+    if op == 'regex':
+        search = re.compile(str(value)).search
+        return lambda row: search(_cell(row, index)) is not None
+
+    threshold = float(value)
+    compare = {
+        'gt': lambda n: n > threshold,
+        'gte': lambda n: n >= threshold,
+        'lt': lambda n: n < threshold,
+        'lte': lambda n: n <= threshold,
+    }[op]
+
+    def predicate(row):
+        number = _to_number(_cell(row, index))
+        return number is not None and compare(number)
+
+    return predicate
+
+def _cell(row, index):
+    # Google Sheets trims trailing empty cells, so short rows are common.
+    return row[index] if index < len(row) else ''
+
+def compile_rules(raw, headers):
+    """Compile stored rules into (predicate, recipient) pairs.
+
+    Column names are resolved against the sheet's header row once, so
+    evaluating a row is a plain index lookup. Raises ValueError if there is
+    no header row yet or a rule references a column that is not in it.
+    """
+    rules = parse_rules(raw)
+    if rules and not headers:
+        raise ValueError("Sheet has no header row yet")
+
+    columns = {}
+    for i, header in enumerate(headers):
+        columns.setdefault(str(header).strip().lower(), i)
+
+    compiled = []
+    for rule in rules:
+        predicates = []
+        for condition in _conditions(rule):
+            column = condition['column'].strip()
+            index = columns.get(column.lower())
+            if index is None:
+                raise ValueError(f"Filter column {column!r} not found in sheet headers")
+            predicates.append(_make_predicate(index, condition['op'], condition['value']))
+        if len(predicates) == 1:
+            predicate = predicates[0]
+        else:
+            predicate = lambda row, predicates=predicates: all(p(row) for p in predicates)
+        compiled.append((predicate, rule.get('recipient')))
+    return compiled
+
+class HeaderBoundRules:
+    """Compiled rules tied to the header row they were compiled against.
+
+    for_headers() recompiles whenever the sheet's header row changes, so a
+    column that is inserted, deleted or moved never leaves a predicate
+    reading the wrong index.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.headers = None
+        self.compiled = None
+
+    def for_headers(self, headers):
+        headers = list(headers)
+        if self.compiled is None or headers != self.headers:
+            self.compiled = None
+            self.headers = headers
+            self.compiled = compile_rules(self.raw, headers)
+        return self.compiled
+
+def route_rows(compiled, rows, default_recipient):
+    """Evaluate compiled rules over a batch of rows in a single pass.
+
+    Returns an ordered mapping of recipient -> matching rows. A row matching
+    several rules with the same recipient is only routed there once. With no
+    rules every row goes to the default recipient.
+    """
+    if not compiled:
+        return {default_recipient: list(rows)} if rows else {}
+
+    routed = {}
+    for row in rows:
+        seen = set()
+        for predicate, recipient in compiled:
+            target = recipient or default_recipient
+            if target in seen or not predicate(row):
+                continue
+            seen.add(target)
+            routed.setdefault(target, []).append(row)
+    return routed
@@ -1,7 +1,8 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, BooleanField, SubmitField, IntegerField
+from wtforms import StringField, PasswordField, BooleanField, SubmitField, IntegerField, TextAreaField
 from wtforms.validators import DataRequired, Email, EqualTo, ValidationError, Length
 from app.models import User
+from app.filters import parse_rules
 
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
@@ -34,4 +35,11 @@ class ConfigurationForm(FlaskForm):
     gmail_app_password = PasswordField('Gmail App Password', validators=[DataRequired()])
     recipient_email = StringField('Recipient Email', validators=[DataRequired(), Email()])
     poll_interval = IntegerField('Poll Interval (seconds)', default=30)
-    submit = SubmitField('Save Configuration')
\ No newline at end of file
+    filter_rules = TextAreaField('Filter Rules (JSON)')
+    submit = SubmitField('Save Configuration')
+
+    def validate_filter_rules(self, filter_rules):
+        try:
+            parse_rules(filter_rules.data)
+        except ValueError as e:
+            raise ValidationError(str(e))
\ No newline at end of file
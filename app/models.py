@@ -1,6 +1,11 @@
 from app import db, login_manager
+from flask import current_app
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
 from datetime import datetime
+import threading
+import time
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(UserMixin, db.Model):
@@ -31,6 +36,7 @@ class Configuration(db.Model):
     gmail_app_password = db.Column(db.String(100), nullable=False)
     recipient_email = db.Column(db.String(120), nullable=False)
     poll_interval = db.Column(db.Integer, default=30)
+    filter_rules = db.Column(db.Text)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     logs = db.relationship('Log', backref='configuration', lazy='dynamic')
@@ -48,6 +54,59 @@ class Log(db.Model):
     def __repr__(self):
         return f'<Log {self.level}: {self.message}>'
 
+# Short-lived identity cache so polling endpoints don't hit the DB for the
+# user on every request. Entries are (column values, expires_at) keyed by
+# user id; a fresh detached User is rebuilt from them per request so no ORM
+# instance is shared between request threads or sessions.
+#
+# The cache is per process: invalidation (logout, or any committed change to
+# a User row such as a password change) only clears this worker's entry, so
+# other gunicorn workers can serve the old values for up to USER_CACHE_TTL.
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+# Bumped on every invalidation so a load that raced with it is not cached.
+_user_cache_generation = 0
+
+def invalidate_user_cache(user_id):
+    global _user_cache_generation
+    with _user_cache_lock:
+        _user_cache.pop(int(user_id), None)
+        _user_cache_generation += 1
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('changed_user_ids', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        invalidate_user_cache(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
+
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
\ No newline at end of file
+    user_id = int(id)
+    now = time.monotonic()
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+        generation = _user_cache_generation
+    if cached and cached[1] > now:
+        user = User(**cached[0])
+        make_transient_to_detached(user)
+        # Attach to this request's session without re-querying.
+        return db.session.merge(user, load=False)
+
+    user = db.session.get(User, user_id)
+    if user is not None:
+        values = {column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs}
+        ttl = current_app.config.get('USER_CACHE_TTL', 30)
+        with _user_cache_lock:
+            if generation == _user_cache_generation:
+                _user_cache[user_id] = (values, now + ttl)
+    return user
@@ -1,29 +1,56 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app, Response
 from flask_login import login_required, current_user
 from app import db
 from app.models import User, Configuration, Log
-from app.utils import start_monitoring, stop_monitoring
+from app.utils import start_monitoring, stop_monitoring, start_monitoring_many, stop_monitoring_many, monitor_threads
+from app.bulk import parse_import, validate_import_row, export_configurations
 from app.forms import ConfigurationForm
+from sqlalchemy import func
+import csv
 import json
 
 main_bp = Blueprint('main', __name__)
 
+def get_user_configuration(id):
+    # Ownership is part of the filter, so a configuration that is missing or
+    # belongs to another user both come back as None.
+    return Configuration.query.filter_by(id=id, user_id=current_user.id).first()
+
+def load_configuration_overview(user_id):
+    """Load a user's configurations with their latest log and monitor status.
+
+    Uses two queries regardless of how many configurations the user has.
+    """
+    configurations = Configuration.query.filter_by(user_id=user_id).order_by(Configuration.created_at).all()
+
+    latest_ids = db.session.query(func.max(Log.id)) \
+        .join(Configuration) \
+        .filter(Configuration.user_id == user_id) \
+        .group_by(Log.configuration_id)
+    latest_logs = {log.configuration_id: log for log in Log.query.filter(Log.id.in_(latest_ids))}
+
+    monitor_status = {config.id: config.id in monitor_threads for config in configurations}
+    return configurations, latest_logs, monitor_status
+
 @main_bp.route('/')
 @login_required
 def index():
-    configurations = current_user.configurations.all()
-    return render_template('index.html', configurations=configurations)
+    configurations, latest_logs, monitor_status = load_configuration_overview(current_user.id)
+    return render_template('index.html', configurations=configurations,
+                           latest_logs=latest_logs, monitor_status=monitor_status)
 
 @main_bp.route('/dashboard')
 @login_required
 def dashboard():
-    configurations = current_user.configurations.all()
+    configurations, latest_logs, monitor_status = load_configuration_overview(current_user.id)
+    active_configs = sum(1 for config in configurations if config.is_active)
     stats = {
-        'total_configs': configurations.count(),
-        'active_configs': configurations.filter_by(is_active=True).count(),
-        'inactive_configs': configurations.filter_by(is_active=False).count(),
+        'total_configs': len(configurations),
+        'active_configs': active_configs,
+        'inactive_configs': len(configurations) - active_configs,
     }
-    return render_template('dashboard.html', stats=stats, configurations=configurations)
+    return render_template('dashboard.html', stats=stats, configurations=configurations,
+                           latest_logs=latest_logs, monitor_status=monitor_status)
 
 @main_bp.route('/configuration/new', methods=['GET', 'POST'])
 @login_required
@@ -38,6 +65,7 @@ def new_configuration():
             gmail_app_password=form.gmail_app_password.data,
             recipient_email=form.recipient_email.data,
             poll_interval=form.poll_interval.data,
+            filter_rules=form.filter_rules.data,
             user=current_user
         )
         db.session.add(config)
@@ -54,8 +82,8 @@ def new_configuration():
 @main_bp.route('/configuration/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit_configuration(id):
-    config = Configuration.query.get_or_404(id)
-    if config.user != current_user:
+    config = get_user_configuration(id)
+    if config is None:
         flash('You do not have permission to edit this configuration.', 'danger')
         return redirect(url_for('main.dashboard'))
     
@@ -82,8 +110,8 @@ def edit_configuration(id):
 @main_bp.route('/configuration/<int:id>/delete', methods=['POST'])
 @login_required
 def delete_configuration(id):
-    config = Configuration.query.get_or_404(id)
-    if config.user != current_user:
+    config = get_user_configuration(id)
+    if config is None:
         flash('You do not have permission to delete this configuration.', 'danger')
         return redirect(url_for('main.dashboard'))
     
@@ -99,8 +127,8 @@ def delete_configuration(id):
 @main_bp.route('/configuration/<int:id>/toggle', methods=['POST'])
 @login_required
 def toggle_configuration(id):
-    config = Configuration.query.get_or_404(id)
-    if config.user != current_user:
+    config = get_user_configuration(id)
+    if config is None:
         return jsonify({'status': 'error', 'message': 'Permission denied'})
     
     config.is_active = not config.is_active
@@ -116,8 +144,8 @@ def toggle_configuration(id):
 @main_bp.route('/api/logs/<int:config_id>')
 @login_required
 def get_logs(config_id):
-    config = Configuration.query.get_or_404(config_id)
-    if config.user != current_user:
+    config = get_user_configuration(config_id)
+    if config is None:
         return jsonify({'status': 'error', 'message': 'Permission denied'})
     
     logs = config.logs.order_by(Log.created_at.desc()).limit(50).all()
@@ -133,8 +161,10 @@ def get_logs(config_id):
 @main_bp.route('/api/stats')
 @login_required
 def get_stats():
-    total_configs = current_user.configurations.count()
-    active_configs = current_user.configurations.filter_by(is_active=True).count()
+    total_configs, active_configs = db.session.query(
+        func.count(Configuration.id),
+        func.count(Configuration.id).filter(Configuration.is_active.is_(True))
+    ).filter(Configuration.user_id == current_user.id).one()
     
     return jsonify({
         'status': 'success',
@@ -143,4 +173,120 @@ def get_stats():
             'active_configs': active_configs,
             'inactive_configs': total_configs - active_configs
         }
-    })
\ No newline at end of file
+    })
+
+@main_bp.route('/api/configurations/import', methods=['POST'])
+@login_required
+def import_configurations():
+    upload = request.files.get('file')
+    try:
+        if upload is not None:
+            text = upload.read().decode('utf-8-sig')
+            fmt = 'csv' if upload.filename.lower().endswith('.csv') else 'json'
+        else:
+            text = request.get_data(as_text=True)
+            fmt = 'csv' if request.mimetype == 'text/csv' else 'json'
+        rows = parse_import(text, fmt)
+    except (ValueError, csv.Error) as e:
+        return jsonify({'status': 'error', 'message': f'Could not parse import: {e}'}), 400
+
+    configs = []
+    errors = []
+    for i, row in enumerate(rows, start=1):
+        values, row_errors = validate_import_row(row)
+        if row_errors:
+            errors.append({'row': i, 'errors': row_errors})
+        else:
+            configs.append(Configuration(user_id=current_user.id, **values))
+
+    # All or nothing: a single invalid row rejects the whole import.
+    if errors:
+        return jsonify({'status': 'error', 'message': 'Import failed validation', 'errors': errors}), 400
+
+    db.session.add_all(configs)
+    db.session.flush()
+    ids = [config.id for config in configs]
+    active_ids = [config.id for config in configs if config.is_active]
+    db.session.commit()
+
+    # Reload once after the commit expired the instances, rather than
+    # refreshing each configuration individually.
+    if active_ids:
+        active = Configuration.query.filter(Configuration.id.in_(active_ids)).all()
+        start_monitoring_many(active, current_app.config['GOOGLE_CREDENTIALS_PATH'])
+
+    return jsonify({
+        'status': 'success',
+        'message': f'Imported {len(ids)} configurations',
+        'ids': ids
+    })
+
+@main_bp.route('/api/configurations/bulk', methods=['POST'])
+@login_required
+def bulk_toggle_configurations():
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action not in ('activate', 'deactivate'):
+        return jsonify({'status': 'error', 'message': "action must be 'activate' or 'deactivate'"}), 400
+
+    # Either explicit ids or at least one filter is required, so an empty
+    # request can never select every configuration the user owns.
+    query = Configuration.query.filter_by(user_id=current_user.id)
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not ids or \
+                not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({'status': 'error', 'message': 'ids must be a non-empty list of integers'}), 400
+        query = query.filter(Configuration.id.in_(ids))
+    else:
+        filters = data.get('filter')
+        if not isinstance(filters, dict) or not filters.keys() & {'is_active', 'spreadsheet_id', 'name_contains'}:
+            return jsonify({'status': 'error',
+                            'message': 'Provide ids or a filter with is_active, spreadsheet_id or name_contains'}), 400
+        if 'is_active' in filters:
+            if not isinstance(filters['is_active'], bool):
+                return jsonify({'status': 'error', 'message': 'filter is_active must be true or false'}), 400
+            query = query.filter(Configuration.is_active.is_(filters['is_active']))
+        for key in ('spreadsheet_id', 'name_contains'):
+            if key in filters and (not isinstance(filters[key], str) or not filters[key]):
+                return jsonify({'status': 'error', 'message': f'filter {key} must be a non-empty string'}), 400
+        if 'spreadsheet_id' in filters:
+            query = query.filter(Configuration.spreadsheet_id == filters['spreadsheet_id'])
+        if 'name_contains' in filters:
+            query = query.filter(Configuration.name.contains(filters['name_contains'], autoescape=True))
+
+    is_active = action == 'activate'
+    ids = [config_id for (config_id,) in query.with_entities(Configuration.id)]
+    if ids:
+        Configuration.query.filter(Configuration.id.in_(ids)) \
+            .update({Configuration.is_active: is_active}, synchronize_session=False)
+        db.session.commit()
+
+    if is_active:
+        configs = Configuration.query.filter(Configuration.id.in_(ids)).all() if ids else []
+        changed = start_monitoring_many(configs, current_app.config['GOOGLE_CREDENTIALS_PATH'])
+    else:
+        changed = stop_monitoring_many(ids)
+
+    return jsonify({
+        'status': 'success',
+        'message': f'{len(ids)} configurations {action}d',
+        'ids': ids,
+        'monitors_changed': len(changed),
+        'is_active': is_active
+    })
+
+@main_bp.route('/api/configurations/export')
+@login_required
+def export_configurations_view():
+    fmt = request.args.get('format', 'json')
+    if fmt not in ('json', 'csv'):
+        return jsonify({'status': 'error', 'message': "format must be 'json' or 'csv'"}), 400
+
+    configurations = Configuration.query.filter_by(user_id=current_user.id).order_by(Configuration.id).all()
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/json'
+    return Response(
+        export_configurations(configurations, fmt),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=configurations.{fmt}'}
+    )
@@ -6,6 +6,7 @@ import smtplib
 from datetime import datetime
 from app import db
 from app.models import Log
+from app.filters import HeaderBoundRules, route_rows
 import threading
 import time
 
@@ -21,11 +22,12 @@ def authenticate_google(credentials_path):
     except Exception as e:
         return None
 
-def send_email(config, row_data):
+def send_email(config, row_data, recipient=None):
+    recipient = recipient or config.recipient_email
     try:
         msg = MIMEMultipart('alternative')
         msg['From'] = config.sender_email
-        msg['To'] = config.recipient_email
+        msg['To'] = recipient
         msg['Subject'] = 'New Row Added to Google Sheet'
 
         body = f"A new row has been added to your Google Sheet:\n\n"
@@ -43,7 +45,7 @@ def send_email(config, row_data):
             server.login(config.sender_email, config.gmail_app_password)
             server.send_message(msg)
             
-        log_message(config.id, f"Email sent to {config.recipient_email}", "SUCCESS")
+        log_message(config.id, f"Email sent to {recipient}", "SUCCESS")
         return True
         
     except Exception as e:
@@ -65,20 +67,47 @@ def monitor_configuration(config, credentials_path):
         spreadsheet = client.open_by_key(config.spreadsheet_id)
         worksheet = spreadsheet.worksheet(config.worksheet_name)
         last_row_count = len(worksheet.get_all_values())
+        # Rules are compiled against the current header row and recompiled
+        # when it changes. If that fails (empty sheet, or a rule naming a
+        # missing column) new rows are held back and retried on the next poll.
+        rule_set = HeaderBoundRules(config.filter_rules)
+        rules = None
+        rules_error = None
         
         log_message(config.id, f"Started monitoring. Initial rows: {last_row_count}", "INFO")
         
-        while config.id in monitor_threads and monitor_threads[config.id]['running']:
+        while _is_current_monitor(config.id):
             try:
                 all_values = worksheet.get_all_values()
                 current_row_count = len(all_values)
                 
                 if current_row_count > last_row_count:
-                    new_rows = all_values[last_row_count:]
+                    previous_headers = rule_set.headers
+                    try:
+                        rules = rule_set.for_headers(all_values[0])
+                        rules_error = None
+                    except ValueError as e:
+                        rules = None
+                        if str(e) != rules_error:
+                            rules_error = str(e)
+                            log_message(config.id, f"Filter rules not applied, retrying next poll: {e}", "ERROR")
+                    if rules and previous_headers is not None and previous_headers != rule_set.headers:
+                        log_message(config.id, "Sheet headers changed; filter rules recompiled", "INFO")
+                
+                if current_row_count > last_row_count and rules is not None:
+                    # The header row is never a data row once rules apply.
+                    first_new_row = max(last_row_count, 1) if rules else last_row_count
+                    new_rows = all_values[first_new_row:]
                     log_message(config.id, f"Found {len(new_rows)} new rows", "INFO")
                     
-                    for row in new_rows:
-                        send_email(config, row)
+                    routed = route_rows(rules, new_rows, config.recipient_email)
+                    if rules:
+                        matched = sum(len(rows) for rows in routed.values())
+                        log_message(config.id, f"{matched} routed deliveries matched filter rules", "INFO")
+                    
+                    for recipient, rows in routed.items():
+                        for row in rows:
+                            send_email(config, row, recipient)
                     
                     last_row_count = current_row_count
                 
@@ -91,24 +120,55 @@ def monitor_configuration(config, credentials_path):
     except Exception as e:
         log_message(config.id, f"Failed to start monitoring: {str(e)}", "ERROR")
     finally:
-        if config.id in monitor_threads:
-            del monitor_threads[config.id]
+        # Only remove our own entry; after a quick stop/start the id may
+        # already belong to a newer thread.
+        if monitor_threads.get(config.id, {}).get('thread') is threading.current_thread():
+            monitor_threads.pop(config.id, None)
+
+def _is_current_monitor(config_id):
+    entry = monitor_threads.get(config_id)
+    return entry is not None and entry['thread'] is threading.current_thread() and entry['running']
+
+def log_messages(entries):
+    """Write several (config_id, message, level) log entries in one commit."""
+    if not entries:
+        return
+    db.session.add_all([Log(configuration_id=config_id, message=message, level=level)
+                        for config_id, message, level in entries])
+    db.session.commit()
 
 def start_monitoring(config, credentials_path):
-    if config.id in monitor_threads:
-        return  # Already monitoring
-    
-    monitor_threads[config.id] = {
-        'running': True,
-        'thread': threading.Thread(target=monitor_configuration, args=(config, credentials_path))
-    }
-    monitor_threads[config.id]['thread'].daemon = True
-    monitor_threads[config.id]['thread'].start()
-    log_message(config.id, "Monitoring started", "INFO")
+    start_monitoring_many([config], credentials_path)
 
 def stop_monitoring(config_id):
-    if config_id in monitor_threads:
-        monitor_threads[config_id]['running'] = False
-        if config_id in monitor_threads:
-            del monitor_threads[config_id]
-        log_message(config_id, "Monitoring stopped", "INFO")
\ No newline at end of file
+    stop_monitoring_many([config_id])
+
+def start_monitoring_many(configs, credentials_path):
+    started = []
+    threads = []
+    for config in configs:
+        if config.id in monitor_threads:
+            continue  # Already monitoring
+        thread = threading.Thread(target=monitor_configuration, args=(config, credentials_path))
+        thread.daemon = True
+        monitor_threads[config.id] = {'running': True, 'thread': thread}
+        started.append(config.id)
+        threads.append(thread)
+
+    # Start from the local list: a concurrent stop may already have removed
+    # an entry from monitor_threads.
+    for thread in threads:
+        thread.start()
+    log_messages([(config_id, "Monitoring started", "INFO") for config_id in started])
+    return started
+
+def stop_monitoring_many(config_ids):
+    stopped = []
+    for config_id in config_ids:
+        entry = monitor_threads.pop(config_id, None)
+        if entry is not None:
+            entry['running'] = False
+            stopped.append(config_id)
+
+    log_messages([(config_id, "Monitoring stopped", "INFO") for config_id in stopped])
+    return stopped
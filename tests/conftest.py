@@ -0,0 +1,6 @@
+import os
+import sys
+
+# app/__init__.py imports its settings as a top-level `config` module, the
+# same way run.py and wsgi.py resolve it when started from inside app/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app'))
@@ -0,0 +1,98 @@
+import json
+import pytest
+from app.bulk import parse_import, validate_import_row, export_configurations
+
+def make_row(**overrides):
+    row = {
+        'name': 'Leads',
+        'spreadsheet_id': 'sheet-1',
+        'sender_email': 'sender@example.com',
+        'gmail_app_password': 'app-password',
+        'recipient_email': 'team@example.com',
+    }
+    row.update(overrides)
+    return row
+
+def test_valid_row_gets_defaults():
+    values, errors = validate_import_row(make_row())
+    assert errors == []
+    assert values['worksheet_name'] == 'Sheet1'
+    assert values['poll_interval'] == 30
+    assert values['filter_rules'] is None
+    assert values['is_active'] is True
+
+def test_row_must_be_object():
+    assert validate_import_row(['Leads']) == (None, ['Row must be an object'])
+
+@pytest.mark.parametrize('overrides, message', [
+    ({'name': ''}, 'name is required'),
+    ({'sender_email': 'not-an-email'}, 'sender_email is not a valid email address'),
+    ({'poll_interval': 'often'}, 'poll_interval must be an integer'),
+    ({'poll_interval': -5}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': 0}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': '0'}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': True}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': 1.9}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': '1.5'}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': 86401}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': '99999999999999999999'}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'poll_interval': [60]}, 'poll_interval must be an integer between 1 and 86400'),
+    ({'name': 'x' * 101}, 'name must be at most 100 characters'),
+    ({'recipient_email': 'a' * 110 + '@example.com'}, 'recipient_email must be at most 120 characters'),
+    ({'spreadsheet_id': 12345}, 'spreadsheet_id must be a string'),
+    ({'filter_rules': 5}, 'filter_rules must be a JSON string or a list of rules'),
+    ({'filter_rules': 'nope'}, 'Filter rules must be valid JSON'),
+    ({'filter_rules': {'column': 'Status'}}, 'Filter rules must be a JSON list of rules'),
+    ({'is_active': 'maybe'}, 'is_active must be one of'),
+    ({'is_active': '2'}, 'is_active must be one of'),
+])
+def test_invalid_rows_report_errors(overrides, message):
+    _, errors = validate_import_row(make_row(**overrides))
+    assert any(message in error for error in errors), errors
+
+@pytest.mark.parametrize('raw, expected', [
+    ('yes', True), ('0', False), ('False', False), (True, True), (False, False), ('', True),
+])
+def test_is_active_values(raw, expected):
+    values, errors = validate_import_row(make_row(is_active=raw))
+    assert errors == []
+    assert values['is_active'] is expected
+
+@pytest.mark.parametrize('raw, expected', [
+    (None, 30), ('', 30), ('60', 60), (60, 60), (120.0, 120), (1, 1), (86400, 86400),
+])
+def test_poll_interval_values(raw, expected):
+    values, errors = validate_import_row(make_row(poll_interval=raw))
+    assert errors == []
+    assert values['poll_interval'] == expected
+
+def test_filter_rules_list_is_stored_as_json():
+    rules = [{'column': 'Status', 'op': 'eq', 'value': 'urgent'}]
+    values, errors = validate_import_row(make_row(filter_rules=rules))
+    assert errors == []
+    assert json.loads(values['filter_rules']) == rules
+
+def test_parse_csv_and_json():
+    text = 'name,spreadsheet_id,is_active\nLeads,sheet-1,no\n'
+    assert parse_import(text, 'csv') == [{'name': 'Leads', 'spreadsheet_id': 'sheet-1', 'is_active': 'no'}]
+    assert parse_import('{"configurations": [{"name": "Leads"}]}', 'json') == [{'name': 'Leads'}]
+    with pytest.raises(ValueError):
+        parse_import('{"name": "Leads"}', 'json')
+
+class FakeConfiguration:
+    id = 7
+    name = 'Leads'
+    spreadsheet_id = 'sheet-1'
+    worksheet_name = 'Sheet1'
+    sender_email = 'sender@example.com'
+    gmail_app_password = 'secret'
+    recipient_email = 'team@example.com'
+    poll_interval = 30
+    filter_rules = None
+    is_active = True
+
+def test_export_omits_app_password():
+    for fmt in ('json', 'csv'):
+        output = export_configurations([FakeConfiguration()], fmt)
+        assert 'Leads' in output
+        assert 'secret' not in output
@@ -0,0 +1,107 @@
+import json
+import pytest
+from app.filters import parse_rules, compile_rules, route_rows, HeaderBoundRules
+
+HEADERS = ['Status', 'Amount', 'Email']
+
+def rules(*items):
+    return json.dumps(list(items))
+
+def test_parse_rules_empty():
+    assert parse_rules(None) == []
+    assert parse_rules('  ') == []
+
+@pytest.mark.parametrize('raw, message', [
+    ('not json', 'valid JSON'),
+    ('{"column": "Status"}', 'JSON list'),
+    (rules({'op': 'eq', 'value': 'x'}), 'missing a column'),
+    (rules({'column': None, 'op': 'eq', 'value': 'x'}), 'missing a column'),
+    (rules({'column': 'Status', 'op': 'like', 'value': 'x'}), 'unknown operator'),
+    (rules({'column': 'Status', 'op': 'eq'}), 'missing a value'),
+    (rules({'column': 'Amount', 'op': 'gt', 'value': 'lots'}), 'not a number'),
+    (rules({'column': 'Email', 'op': 'regex', 'value': '('}), 'invalid regex'),
+    (rules({'column': 'Status', 'op': 'eq', 'value': 'x', 'recipient': 'a@b\nBcc: x@y'}), 'invalid recipient'),
+    (rules({'all': []}), 'non-empty list'),
+    (rules({'all': [{'column': 'Status', 'op': 'eq'}]}), 'Rule 1 condition 1 is missing a value'),
+])
+def test_parse_rules_rejects_invalid(raw, message):
+    with pytest.raises(ValueError, match=message):
+        parse_rules(raw)
+
+def test_compile_rules_requires_header_row():
+    raw = rules({'column': 'Status', 'op': 'eq', 'value': 'urgent'})
+    with pytest.raises(ValueError, match='no header row'):
+        compile_rules(raw, [])
+    assert compile_rules(None, []) == []
+
+def test_compile_rules_unknown_column():
+    with pytest.raises(ValueError, match="'Priority' not found"):
+        compile_rules(rules({'column': 'Priority', 'op': 'eq', 'value': 'high'}), HEADERS)
+
+def test_compile_rules_resolves_headers_case_insensitively():
+    [(predicate, recipient)] = compile_rules(rules({'column': ' status ', 'op': 'eq', 'value': 'URGENT'}), HEADERS)
+    assert predicate(['urgent', '1'])
+    assert not predicate(['normal', '1'])
+    assert recipient is None
+
+@pytest.mark.parametrize('op, value, cell, expected', [
+    ('ne', 'closed', 'open', True),
+    ('contains', 'corp', 'j@CORP.com', True),
+    ('regex', r'@corp\.com$', 'j@corp.com', True),
+    ('gt', 1000, '2,000', True),
+    ('gte', 1000, '1000', True),
+    ('lt', 1000, '1000', False),
+    ('lte', 1000, 'n/a', False),
+])
+def test_operators(op, value, cell, expected):
+    [(predicate, _)] = compile_rules(rules({'column': 'Amount', 'op': op, 'value': value}), HEADERS)
+    assert predicate(['x', cell]) is expected
+
+def test_short_rows_read_as_empty_cells():
+    [(predicate, _)] = compile_rules(rules({'column': 'Email', 'op': 'eq', 'value': ''}), HEADERS)
+    assert predicate(['urgent'])
+
+def test_all_conditions_must_match():
+    raw = rules({'all': [{'column': 'Status', 'op': 'eq', 'value': 'urgent'},
+                         {'column': 'Amount', 'op': 'gt', 'value': 1000}]})
+    [(predicate, _)] = compile_rules(raw, HEADERS)
+    assert predicate(['urgent', '5000'])
+    assert not predicate(['urgent', '5'])
+    assert not predicate(['normal', '5000'])
+
+def test_route_rows_without_rules_sends_everything():
+    assert route_rows([], [['a'], ['b']], 'd@example.com') == {'d@example.com': [['a'], ['b']]}
+    assert route_rows([], [], 'd@example.com') == {}
+
+def test_route_rows_routes_by_recipient_once():
+    raw = rules(
+        {'column': 'Status', 'op': 'eq', 'value': 'urgent', 'recipient': 'ops@example.com'},
+        {'column': 'Amount', 'op': 'gt', 'value': 1000},
+        {'column': 'Amount', 'op': 'gt', 'value': 500},
+    )
+    compiled = compile_rules(raw, HEADERS)
+    rows = [['urgent', '5'], ['normal', '2000'], ['urgent', '9000'], ['normal', '1']]
+    assert route_rows(compiled, rows, 'd@example.com') == {
+        'ops@example.com': [['urgent', '5'], ['urgent', '9000']],
+        'd@example.com': [['normal', '2000'], ['urgent', '9000']],
+    }
+
+def test_header_bound_rules_recompile_when_headers_change():
+    rule_set = HeaderBoundRules(rules({'column': 'Status', 'op': 'eq', 'value': 'urgent'}))
+    [(predicate, _)] = rule_set.for_headers(HEADERS)
+    assert rule_set.for_headers(list(HEADERS))[0][0] is predicate
+
+    # A column inserted before Status moves it to index 1.
+    [(moved, _)] = rule_set.for_headers(['Priority', 'Status', 'Amount'])
+    assert moved is not predicate
+    assert moved(['high', 'urgent', '5'])
+    assert not moved(['urgent', 'normal', '5'])
+
+def test_header_bound_rules_retry_after_failure():
+    rule_set = HeaderBoundRules(rules({'column': 'Status', 'op': 'eq', 'value': 'urgent'}))
+    with pytest.raises(ValueError):
+        rule_set.for_headers(['Amount'])
+    with pytest.raises(ValueError):
+        rule_set.for_headers(['Amount'])
+    [(predicate, _)] = rule_set.for_headers(['Amount', 'Status'])
+    assert predicate(['1', 'urgent'])